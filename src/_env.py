@@ -0,0 +1,55 @@
+# src/_env.py
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# O .env é lido uma única vez, na importação do módulo.
+# load_dotenv também exporta as chaves para os.environ (sem sobrescrever).
+load_dotenv(PROJECT_ROOT / ".env")
+
+
+def _read_settings() -> dict:
+    """
+    Lê e valida as configs comuns (provedor, embeddings e banco).
+    """
+    active_provider = os.getenv("ACTIVE_PROVIDER", "openai").strip().lower()
+    database_url = os.getenv("DATABASE_URL", "")
+    collection_name = os.getenv("PG_VECTOR_COLLECTION_NAME", "documents")
+
+    if not database_url:
+        raise RuntimeError("DATABASE_URL não foi definido no arquivo .env")
+
+    if active_provider == "openai":
+        api_key = os.getenv("OPENAI_API_KEY", "")
+        embedding_model = os.getenv("OPENAI_EMBEDDING_MODEL", "")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY não foi definido no arquivo .env")
+        if not embedding_model:
+            raise RuntimeError("OPENAI_EMBEDDING_MODEL não foi definido no arquivo .env")
+
+    elif active_provider == "gemini":
+        api_key = os.getenv("GOOGLE_API_KEY", "")
+        embedding_model = os.getenv("GOOGLE_EMBEDDING_MODEL", "")
+        if not api_key:
+            raise RuntimeError("GOOGLE_API_KEY não foi definido no arquivo .env")
+        if not embedding_model:
+            raise RuntimeError("GOOGLE_EMBEDDING_MODEL não foi definido no arquivo .env")
+
+    else:
+        raise RuntimeError("ACTIVE_PROVIDER inválido. Use 'openai' ou 'gemini'.")
+
+    return {
+        "active_provider": active_provider,
+        "api_key": api_key,
+        "embedding_model": embedding_model,
+        "database_url": database_url,
+        "collection_name": collection_name,
+    }
+
+
+SETTINGS = _read_settings()
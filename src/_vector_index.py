@@ -0,0 +1,21 @@
+# src/_vector_index.py
+from __future__ import annotations
+
+# Limites de dimensões do índice HNSW no pgvector
+HNSW_MAX_VECTOR_DIMS = 2000
+HNSW_MAX_HALFVEC_DIMS = 4000
+
+
+def index_vector_type(dimension: int) -> str | None:
+    """
+    Tipo usado no índice HNSW da coleção (e no cast feito pela busca).
+
+    Até 2000 dimensões usa `vector`; até 4000, `halfvec` (meia precisão,
+    ex.: gemini-embedding-001 e text-embedding-3-large, com 3072). Acima
+    disso o HNSW não é suportado e a coleção fica sem índice (None).
+    """
+    if dimension <= HNSW_MAX_VECTOR_DIMS:
+        return "vector"
+    if dimension <= HNSW_MAX_HALFVEC_DIMS:
+        return "halfvec"
+    return None
@@ -0,0 +1,180 @@
+# src/batch_embeddings.py
+from __future__ import annotations
+
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+# Intervalo entre consultas ao status do job (jobs em lote levam minutos/horas)
+POLL_INTERVAL_SECONDS = 30
+
+
+def _write_jsonl(lines) -> Path:
+    """
+    Grava as requisições em um arquivo JSONL temporário e devolve o caminho.
+    """
+    with tempfile.NamedTemporaryFile(
+        "w", suffix=".jsonl", encoding="utf-8", delete=False
+    ) as fh:
+        for line in lines:
+            fh.write(json.dumps(line, ensure_ascii=False) + "\n")
+    return Path(fh.name)
+
+
+def _ordered_vectors(by_key: dict, total: int) -> List[List[float]]:
+    """
+    Reordena os vetores pela chave (índice do chunk) e valida se nenhum faltou.
+    """
+    missing = [i for i in range(total) if str(i) not in by_key]
+    if missing:
+        raise RuntimeError(f"Job em lote não retornou embeddings para {len(missing)} chunk(s).")
+    return [by_key[str(i)] for i in range(total)]
+
+
+class GeminiBatchEmbeddings:
+    """
+    Embeddings via Batch API do Gemini (custo menor, sem rate limit interativo).
+    """
+
+    _FINAL_STATES = {
+        "JOB_STATE_SUCCEEDED",
+        "JOB_STATE_FAILED",
+        "JOB_STATE_CANCELLED",
+        "JOB_STATE_EXPIRED",
+    }
+
+    # modelos aceitos por batches.create_embeddings
+    SUPPORTED_MODELS = {"gemini-embedding-001"}
+
+    def __init__(self, api_key: str, model: str):
+        # valida antes do upload: um modelo não suportado só falharia depois
+        if model.removeprefix("models/") not in self.SUPPORTED_MODELS:
+            raise RuntimeError(
+                f"USE_BATCH_EMBEDDINGS com Gemini não suporta o modelo '{model}'. "
+                f"Use GOOGLE_EMBEDDING_MODEL={', '.join(sorted(self.SUPPORTED_MODELS))} "
+                "(e reingira o PDF; a busca usa o mesmo modelo)."
+            )
+
+        try:
+            from google import genai
+        except ImportError:
+            raise RuntimeError(
+                "USE_BATCH_EMBEDDINGS com Gemini requer o pacote google-genai (pip install google-genai)."
+            ) from None
+
+        self.client = genai.Client(api_key=api_key)
+        self.model = model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        from google.genai import types
+
+        # mesmo task type usado pelo GoogleGenerativeAIEmbeddings.embed_documents;
+        # sem output_dimensionality, o vetor tem a dimensão padrão do modelo
+        # (3072), a mesma gerada para a pergunta na busca
+        requests_path = _write_jsonl(
+            {
+                "key": str(i),
+                "request": {
+                    "content": {"parts": [{"text": text}]},
+                    "task_type": "RETRIEVAL_DOCUMENT",
+                },
+            }
+            for i, text in enumerate(texts)
+        )
+        try:
+            uploaded = self.client.files.upload(
+                file=str(requests_path),
+                config=types.UploadFileConfig(display_name="ingest-embeddings", mime_type="jsonl"),
+            )
+        finally:
+            requests_path.unlink(missing_ok=True)
+
+        job = self.client.batches.create_embeddings(
+            model=self.model,
+            src=types.EmbeddingsBatchJobSource(file_name=uploaded.name),
+            config={"display_name": "ingest-embeddings"},
+        )
+        print(f"Job em lote (Gemini) criado: {job.name}")
+
+        while job.state.name not in self._FINAL_STATES:
+            time.sleep(POLL_INTERVAL_SECONDS)
+            job = self.client.batches.get(name=job.name)
+            print(f"Status do job: {job.state.name}")
+
+        if job.state.name != "JOB_STATE_SUCCEEDED":
+            raise RuntimeError(f"Job em lote do Gemini terminou com status {job.state.name}")
+
+        content = self.client.files.download(file=job.dest.file_name).decode("utf-8")
+
+        by_key = {}
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            # linhas de sucesso podem trazer "error": null
+            if item.get("error") or "response" not in item:
+                raise RuntimeError(f"Erro no chunk {item.get('key')}: {item['error']}")
+            by_key[item["key"]] = item["response"]["embedding"]["values"]
+
+        return _ordered_vectors(by_key, len(texts))
+
+
+class OpenAIBatchEmbeddings:
+    """
+    Embeddings via Batch API da OpenAI (endpoint /v1/embeddings).
+    """
+
+    _FINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+    def __init__(self, api_key: str, model: str):
+        from openai import OpenAI
+
+        self.client = OpenAI(api_key=api_key)
+        self.model = model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        requests_path = _write_jsonl(
+            {
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/embeddings",
+                "body": {"model": self.model, "input": text},
+            }
+            for i, text in enumerate(texts)
+        )
+        try:
+            with requests_path.open("rb") as fh:
+                uploaded = self.client.files.create(file=fh, purpose="batch")
+        finally:
+            requests_path.unlink(missing_ok=True)
+
+        job = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint="/v1/embeddings",
+            completion_window="24h",
+        )
+        print(f"Job em lote (OpenAI) criado: {job.id}")
+
+        while job.status not in self._FINAL_STATES:
+            time.sleep(POLL_INTERVAL_SECONDS)
+            job = self.client.batches.retrieve(job.id)
+            print(f"Status do job: {job.status}")
+
+        if job.status != "completed" or not job.output_file_id:
+            raise RuntimeError(f"Job em lote da OpenAI terminou com status {job.status}")
+
+        content = self.client.files.content(job.output_file_id).text
+
+        by_key = {}
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if item.get("error") or response.get("status_code") != 200:
+                raise RuntimeError(f"Erro no chunk {item.get('custom_id')}: {item.get('error') or response}")
+            by_key[item["custom_id"]] = response["body"]["data"][0]["embedding"]
+
+        return _ordered_vectors(by_key, len(texts))
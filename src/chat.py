@@ -2,71 +2,198 @@
 from __future__ import annotations
 
 import os
-from pathlib import Path
+import queue
+import sys
+import threading
+from collections import deque
+from concurrent.futures import Future
+from functools import lru_cache
 
-from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 
-from search import search_prompt
+from _env import SETTINGS
+from search import search_prompt, search_prompts, warm_up
 
+try:
+    # ativa edição de linha e histórico no input() (indisponível no Windows)
+    import readline  # noqa: F401
+except ImportError:
+    pass
 
+
+@lru_cache(maxsize=None)
 def load_llm():
     """
-    Inicializa a LLM de acordo com o ACTIVE_PROVIDER.
+    Inicializa a LLM de acordo com o ACTIVE_PROVIDER (uma única vez por processo).
     """
-    project_root = Path(__file__).resolve().parents[1]
-    load_dotenv(project_root / ".env")
-
-    active_provider = os.getenv("ACTIVE_PROVIDER", "openai").strip().lower()
+    active_provider = SETTINGS["active_provider"]
+    api_key = SETTINGS["api_key"]
 
     if active_provider == "openai":
-        api_key = os.getenv("OPENAI_API_KEY", "")
-        if not api_key:
-            raise RuntimeError("OPENAI_API_KEY não definido no .env")
-        os.environ["OPENAI_API_KEY"] = api_key
-
         model = os.getenv("OPENAI_LLM_MODEL", "gpt-5-nano")
-        return ChatOpenAI(model=model, temperature=0)
+        return ChatOpenAI(model=model, temperature=0, api_key=api_key)
 
     if active_provider == "gemini":
-        api_key = os.getenv("GOOGLE_API_KEY", "")
-        if not api_key:
-            raise RuntimeError("GOOGLE_API_KEY não definido no .env")
-        os.environ["GOOGLE_API_KEY"] = api_key
-
         model = os.getenv("GOOGLE_LLM_MODEL", "gemini-2.5-flash-lite")
-        return ChatGoogleGenerativeAI(model=model, temperature=0)
+        return ChatGoogleGenerativeAI(model=model, temperature=0, google_api_key=api_key)
 
     raise RuntimeError("ACTIVE_PROVIDER inválido. Use 'openai' ou 'gemini'.")
 
 
-def main() -> None:
-    llm = load_llm()
+EXIT_COMMANDS = {"sair", "exit", "quit"}
 
-    print("Faça sua pergunta (digite 'sair' para encerrar):\n")
 
-    while True:
-        question = input("PERGUNTA: ").strip()
+def _answer_text(response) -> str:
+    # LangChain retorna objeto de mensagem
+    return getattr(response, "content", str(response)).strip()
+
 
+def run_batch(lines) -> None:
+    """
+    Responde perguntas recebidas em lote (ex.: via pipe), uma por linha.
+
+    A busca vetoriza todas as perguntas de uma vez e a LLM recebe os prompts
+    em paralelo via llm.batch.
+    """
+    questions = []
+    for line in lines:
+        question = line.strip()
         if not question:
-            print("Digite uma pergunta válida.\n")
             continue
-
-        if question.lower() in {"sair", "exit", "quit"}:
-            print("Encerrando.")
+        if question.lower() in EXIT_COMMANDS:
             break
+        questions.append(question)
+
+    if not questions:
+        return
+
+    prompts = search_prompts(questions)
+    responses = load_llm().batch(prompts)
+
+    for question, response in zip(questions, responses):
+        print(f"PERGUNTA: {question}")
+        print(f"RESPOSTA: {_answer_text(response)}\n")
+
 
-        # chama a busca + prompt
-        prompt = search_prompt(question)
+# Intervalo para checar o stdin enquanto a LLM responde
+_POLL_SECONDS = 0.1
 
-        # envia o prompt para a LLM
-        response = llm.invoke(prompt)
 
-        # LangChain retorna objeto de mensagem
-        answer = getattr(response, "content", str(response)).strip()
+def _in_background(fn, *args) -> Future:
+    """
+    Executa fn em uma thread daemon e devolve um Future com o resultado.
+
+    Threads daemon não são aguardadas na saída do interpretador: Ctrl+C
+    encerra o chat na hora, mesmo com uma chamada à API em andamento.
+    """
+    future: Future = Future()
+
+    def run() -> None:
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(fn(*args))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def _warm_up() -> None:
+    # executado em background enquanto o usuário digita a primeira pergunta
+    load_llm()
+    warm_up()
+
+
+def _read_lines(lines: queue.Queue) -> None:
+    """
+    Lê o stdin em uma thread separada: o usuário pode digitar a próxima
+    pergunta enquanto a resposta anterior ainda está sendo gerada.
+
+    Usa input() (e não sys.stdin) para manter a edição de linha e o
+    histórico do readline. O prompt "PERGUNTA: " é impresso pelo loop
+    principal, então o readline não o conhece: ao navegar pelo histórico
+    ou limpar a tela, ele pode não ser redesenhado.
+    """
+    try:
+        while True:
+            lines.put(input())
+    except EOFError:
+        pass
+    lines.put(None)  # EOF (Ctrl+D)
+
+
+def _is_question(line) -> bool:
+    return line is not None and bool(line.strip()) and line.strip().lower() not in EXIT_COMMANDS
+
+
+def main() -> None:
+    # entrada via pipe: processa todas as perguntas em lote
+    if not sys.stdin.isatty():
+        run_batch(sys.stdin)
+        return
+
+    warm = _in_background(_warm_up)
+
+    lines: queue.Queue = queue.Queue()
+    threading.Thread(target=_read_lines, args=(lines,), daemon=True).start()
+
+    # linhas digitadas enquanto a resposta anterior era gerada
+    pending: deque = deque()
+    # pergunta -> busca + prompt já em andamento (aguardada em vez de buscar de novo)
+    prefetched: dict[str, Future] = {}
+
+    print("Faça sua pergunta (digite 'sair' para encerrar):\n")
 
-        print(f"RESPOSTA: {answer}\n")
+    try:
+        while True:
+            print("PERGUNTA: ", end="", flush=True)
+            if pending:
+                line = pending.popleft()
+                # repete a pergunta já digitada para o histórico ficar legível
+                print((line or "").strip())
+            else:
+                line = lines.get()
+
+            if line is None:
+                print("\nEncerrando.")
+                break
+
+            question = line.strip()
+
+            if not question:
+                print("Digite uma pergunta válida.\n")
+                continue
+
+            if question.lower() in EXIT_COMMANDS:
+                print("Encerrando.")
+                break
+
+            # propaga erros de configuração do pré-aquecimento (no-op depois da 1ª vez)
+            warm.result()
+
+            # chama a busca + prompt (ou aguarda a que foi adiantada para esta pergunta)
+            prefetch = prefetched.pop(question, None)
+            prompt = prefetch.result() if prefetch is not None else search_prompt(question)
+
+            # envia o prompt para a LLM
+            response = _in_background(load_llm().invoke, prompt)
+
+            # enquanto a LLM responde, adianta a busca das perguntas já digitadas
+            while not response.done():
+                try:
+                    next_line = lines.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+                pending.append(next_line)
+                next_question = (next_line or "").strip()
+                if _is_question(next_line) and next_question not in prefetched:
+                    prefetched[next_question] = _in_background(search_prompt, next_question)
+
+            print(f"RESPOSTA: {_answer_text(response.result())}\n")
+    except KeyboardInterrupt:
+        print("\nEncerrando.")
 
 
 if __name__ == "__main__":
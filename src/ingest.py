@@ -1,18 +1,34 @@
 # src/ingest.py
 from __future__ import annotations
 
+import asyncio
+import gc
 import os
+import re
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime
+from itertools import batched, chain
 from pathlib import Path
 
-from dotenv import load_dotenv
-from langchain_community.document_loaders import PyPDFLoader
+import numpy as np
+import psycopg
+from pgvector.psycopg import register_vector
+from psycopg import sql
+from psycopg.types.json import Jsonb
+from pypdf import PdfReader
+from langchain_core.documents import Document
 from langchain_postgres import PGVector
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from langchain_openai import OpenAIEmbeddings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
+from _env import PROJECT_ROOT, SETTINGS
+from _vector_index import index_vector_type
+from batch_embeddings import GeminiBatchEmbeddings, OpenAIBatchEmbeddings
+
 
 # -----------------------------
 # Config / leitura do ambiente
@@ -26,53 +42,63 @@ class Settings:
     database_url: str
     collection_name: str
     pdf_path: Path
+    embedding_batch_size: int
+    embedding_concurrency: int
+    use_batch_embeddings: bool
+    pg_maintenance_work_mem: str
+    pg_max_parallel_maintenance_workers: int
+
+
+@dataclass(frozen=True)
+class IngestResult:
+    chunks: int
+    indexed: bool
 
 
 def load_settings() -> Settings:
     """
-    Carrega configurações do .env e valida os campos obrigatórios.
+    Monta as configurações da ingestão (o .env já foi lido e validado em _env).
     """
-    project_root = Path(__file__).resolve().parents[1]
-    load_dotenv(project_root / ".env")
-
-    active_provider = os.getenv("ACTIVE_PROVIDER", "openai").strip().lower()
-    database_url = os.getenv("DATABASE_URL", "")
-    collection_name = os.getenv("PG_VECTOR_COLLECTION_NAME", "documents")
-
-    if not database_url:
-        raise RuntimeError("DATABASE_URL não foi definido no arquivo .env")
-
-    if active_provider == "openai":
-        api_key = os.getenv("OPENAI_API_KEY", "")
-        embedding_model = os.getenv("OPENAI_EMBEDDING_MODEL", "")
-        if not api_key:
-            raise RuntimeError("OPENAI_API_KEY não foi definido no arquivo .env")
-        if not embedding_model:
-            raise RuntimeError("OPENAI_EMBEDDING_MODEL não foi definido no arquivo .env")
-
-    elif active_provider == "gemini":
-        api_key = os.getenv("GOOGLE_API_KEY", "")
-        embedding_model = os.getenv("GOOGLE_EMBEDDING_MODEL", "")
-        if not api_key:
-            raise RuntimeError("GOOGLE_API_KEY não foi definido no arquivo .env")
-        if not embedding_model:
-            raise RuntimeError("GOOGLE_EMBEDDING_MODEL não foi definido no arquivo .env")
-
-    else:
-        raise RuntimeError("ACTIVE_PROVIDER inválido. Use 'openai' ou 'gemini'.")
-
-    pdf_path = resolve_pdf_path(project_root)
+    pdf_path = resolve_pdf_path(PROJECT_ROOT)
+    embedding_batch_size = _positive_int_env("EMBEDDING_BATCH_SIZE", 256)
+    embedding_concurrency = _positive_int_env("EMBEDDING_CONCURRENCY", 8)
+    use_batch_embeddings = os.getenv("USE_BATCH_EMBEDDINGS", "").strip().lower() in {"1", "true", "yes"}
+    pg_maintenance_work_mem = os.getenv("PG_MAINTENANCE_WORK_MEM", "").strip() or "512MB"
+    pg_max_parallel_maintenance_workers = _positive_int_env(
+        "PG_MAX_PARALLEL_MAINTENANCE_WORKERS", 2, minimum=0
+    )
 
     return Settings(
-        active_provider=active_provider,
-        api_key=api_key,
-        embedding_model=embedding_model,
-        database_url=database_url,
-        collection_name=collection_name,
+        active_provider=SETTINGS["active_provider"],
+        api_key=SETTINGS["api_key"],
+        embedding_model=SETTINGS["embedding_model"],
+        database_url=SETTINGS["database_url"],
+        collection_name=SETTINGS["collection_name"],
         pdf_path=pdf_path,
+        embedding_batch_size=embedding_batch_size,
+        embedding_concurrency=embedding_concurrency,
+        use_batch_embeddings=use_batch_embeddings,
+        pg_maintenance_work_mem=pg_maintenance_work_mem,
+        pg_max_parallel_maintenance_workers=pg_max_parallel_maintenance_workers,
     )
 
 
+def _positive_int_env(name: str, default: int, minimum: int = 1) -> int:
+    """
+    Lê um inteiro (>= minimum) do ambiente (com valor padrão).
+    """
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise RuntimeError(f"{name} deve ser um número inteiro") from None
+    if value < minimum:
+        raise RuntimeError(f"{name} deve ser maior ou igual a {minimum}")
+    return value
+
+
 def resolve_pdf_path(project_root: Path) -> Path:
     """
     Resolve o PDF via variável de ambiente PDF_PATH (fallback para document.pdf).
@@ -101,33 +127,140 @@ def build_embeddings(active_provider: str, api_key: str, embedding_model: str):
     provider = (active_provider or "").strip().lower()
 
     if provider == "openai":
-        # LangChain OpenAI usa OPENAI_API_KEY como padrão.
-        os.environ["OPENAI_API_KEY"] = api_key
-        return OpenAIEmbeddings(model=embedding_model)
+        return OpenAIEmbeddings(model=embedding_model, api_key=api_key)
 
     if provider == "gemini":
-        # LangChain Google GenAI usa GOOGLE_API_KEY como padrão.
-        os.environ["GOOGLE_API_KEY"] = api_key
-        return GoogleGenerativeAIEmbeddings(model=embedding_model)
+        return GoogleGenerativeAIEmbeddings(model=embedding_model, google_api_key=api_key)
 
     raise ValueError("ACTIVE_PROVIDER inválido. Use 'openai' ou 'gemini'.")
 
 
+def build_batch_embeddings(active_provider: str, api_key: str, embedding_model: str):
+    """
+    Cria o gerador de embeddings via Batch API (custo menor, maior latência).
+    """
+    provider = (active_provider or "").strip().lower()
+
+    if provider == "openai":
+        return OpenAIBatchEmbeddings(api_key=api_key, model=embedding_model)
+
+    if provider == "gemini":
+        return GeminiBatchEmbeddings(api_key=api_key, model=embedding_model)
+
+    raise ValueError("ACTIVE_PROVIDER inválido. Use 'openai' ou 'gemini'.")
+
+
+async def _embed_all(texts, embeddings, batch_size: int = 256, concurrency: int = 8):
+    """
+    Gera os embeddings em lotes, com no máximo `concurrency` requisições simultâneas.
+
+    A chamada ao provedor é limitada por latência de rede, então disparar
+    vários lotes em paralelo aproveita melhor o rate limit da API.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def embed_batch(batch):
+        async with semaphore:
+            return await embeddings.aembed_documents(batch)
+
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+
+    # gather preserva a ordem dos lotes
+    return [vector for batch_vectors in results for vector in batch_vectors]
+
+
 # -----------------------------
 # Pipeline: load -> split -> store
 # -----------------------------
 
+# Acima deste número de páginas, a extração é feita em janelas (limita memória)
+PAGE_WINDOW_THRESHOLD = 200
+PAGE_WINDOW_SIZE = 200
+# Páginas enviadas por vez para cada processo
+PAGE_TASK_CHUNKSIZE = 10
+
+# PdfReader aberto uma única vez em cada processo do pool
+_worker_reader: PdfReader | None = None
+
+
+def _init_pdf_worker(pdf_path: str) -> None:
+    global _worker_reader
+    _worker_reader = PdfReader(pdf_path)
+
+
+def _extract_page_text(page_index: int) -> str:
+    return _worker_reader.pages[page_index].extract_text()
+
+
+def _pdf_metadata(reader: PdfReader, pdf_path: Path) -> dict:
+    """
+    Metadados do documento no mesmo formato do PyPDFLoader.
+
+    Info do PDF (producer, creator, title, ...) com chaves sem "/" e em
+    minúsculas, datas em ISO 8601, mais source e total_pages.
+    """
+    raw = (
+        {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+        | dict(reader.metadata or {})
+        | {"source": str(pdf_path), "total_pages": len(reader.pages)}
+    )
+
+    metadata = {}
+    for key, value in raw.items():
+        if type(value) not in (str, int):
+            value = str(value)
+        key = key.lstrip("/").lower()
+        if key in ("creationdate", "moddate"):
+            try:
+                value = datetime.strptime(value.replace("'", ""), "D:%Y%m%d%H%M%S%z").isoformat("T")
+            except ValueError:
+                pass
+        metadata[key] = value
+    return metadata
+
+
 def load_pdf_documents(pdf_path: Path):
     """
-    Lê o PDF e retorna documentos (por página) em formato LangChain.
+    Lê o PDF e gera documentos (por página) em formato LangChain.
+
+    A extração de texto é CPU-bound, então as páginas são distribuídas
+    entre processos; a ordem das páginas é preservada. Os documentos são
+    produzidos sob demanda (generator), sem materializar o PDF inteiro.
     """
-    loader = PyPDFLoader(str(pdf_path))
-    return loader.load()
+    reader = PdfReader(str(pdf_path))
+    total_pages = len(reader.pages)
+    if total_pages == 0:
+        return
+
+    # metadados lidos uma vez no processo principal; os workers só extraem texto
+    doc_metadata = _pdf_metadata(reader, pdf_path)
+    page_labels = reader.page_labels
+
+    window = total_pages if total_pages <= PAGE_WINDOW_THRESHOLD else PAGE_WINDOW_SIZE
+    workers = min(os.cpu_count() or 1, total_pages)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_pdf_worker,
+        initargs=(str(pdf_path),),
+    ) as executor:
+        for start in range(0, total_pages, window):
+            page_indices = range(start, min(start + window, total_pages))
+            texts = executor.map(_extract_page_text, page_indices, chunksize=PAGE_TASK_CHUNKSIZE)
+            for page_index, text in zip(page_indices, texts):
+                yield Document(
+                    page_content=text,
+                    metadata=doc_metadata | {
+                        "page": page_index,
+                        "page_label": page_labels[page_index],
+                    },
+                )
 
 
 def split_into_chunks(documents):
     """
-    Divide o conteúdo em chunks.
+    Divide o conteúdo em chunks (página a página, sob demanda).
 
     REGRA DO ENUNCIADO (implementada aqui):
     - chunks de 1000 caracteres
@@ -137,16 +270,187 @@ def split_into_chunks(documents):
         chunk_size=1000,     # regra: 1000 caracteres
         chunk_overlap=150,   # regra: overlap 150
     )
-    return splitter.split_documents(documents)
+    for document in documents:
+        yield from splitter.split_documents([document])
+
+
+# Tabelas criadas pelo langchain-postgres
+COLLECTION_TABLE = "langchain_pg_collection"
+EMBEDDING_TABLE = "langchain_pg_embedding"
+
+# Tamanho do lote usado no fallback (quando COPY não está disponível)
+INSERT_BATCH_SIZE = 500
+
+# Índice vetorial por coleção (criado após a carga, não durante os inserts)
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 64
+
+# Parâmetros fixos da sessão de carga; maintenance_work_mem e
+# max_parallel_maintenance_workers vêm do .env (ver Settings)
+BULK_LOAD_SESSION_SETTINGS = {
+    "jit": "off",
+    "synchronous_commit": "off",
+}
 
+# Chave de metadata que identifica a execução da ingestão que gravou o chunk
+INGEST_RUN_KEY = "ingest_run"
 
-def store_chunks_in_pgvector(chunks, settings: Settings):
+# Mínimo de chunks acumulados antes de cada gravação no banco (limita o pico
+# de memória); o lote real é ao menos batch_size * concurrency, para que todas
+# as requisições concorrentes de _embed_all fiquem ocupadas
+FLUSH_BATCH_SIZE = 500
+# Na Batch API cada lote vira um job; 50.000 é o limite de requisições por job da OpenAI
+BATCH_API_FLUSH_SIZE = 50_000
+
+
+def _psycopg_conninfo(database_url: str) -> str:
+    """
+    Converte a URL no formato SQLAlchemy (postgresql+psycopg://) para o formato do psycopg.
+    """
+    return re.sub(r"^postgresql\+\w+://", "postgresql://", database_url)
+
+
+def _get_collection_uuid(conn: psycopg.Connection, collection_name: str):
+    """
+    Retorna o uuid da coleção (criada previamente pelo PGVector).
+    """
+    row = conn.execute(
+        f"SELECT uuid FROM {COLLECTION_TABLE} WHERE name = %s",
+        (collection_name,),
+    ).fetchone()
+    if row is None:
+        raise RuntimeError(f"Coleção não encontrada: {collection_name}")
+    return row[0]
+
+
+def _copy_embeddings(conn: psycopg.Connection, collection_id, texts, vectors: np.ndarray, metadatas) -> None:
+    """
+    Insere o lote com um único COPY binário (uma ida ao banco).
+
+    Os vetores vão como float32 no formato binário do pgvector, sem
+    conversão para texto (4 bytes por dimensão na rede).
+    """
+    copy_sql = (
+        f"COPY {EMBEDDING_TABLE} (id, collection_id, embedding, document, cmetadata) "
+        "FROM STDIN WITH (FORMAT BINARY)"
+    )
+    with conn.cursor() as cur, cur.copy(copy_sql) as copy:
+        copy.set_types(["varchar", "uuid", "vector", "varchar", "jsonb"])
+        for text, vector, metadata in zip(texts, vectors, metadatas):
+            copy.write_row((str(uuid.uuid4()), collection_id, vector, text, Jsonb(metadata)))
+
+
+def _set_session_param(conn: psycopg.Connection, name: str, value) -> None:
+    conn.execute(sql.SQL("SET {} = {}").format(sql.Identifier(name), sql.Literal(str(value))))
+
+
+def _tune_bulk_load_session(conn: psycopg.Connection, settings: Settings) -> None:
+    """
+    Ajusta parâmetros do Postgres só para esta sessão (não altera o servidor).
+
+    maintenance_work_mem e max_parallel_maintenance_workers afetam a criação
+    do índice HNSW, que roda nesta mesma sessão.
+    """
+    session_settings = {
+        **BULK_LOAD_SESSION_SETTINGS,
+        "maintenance_work_mem": settings.pg_maintenance_work_mem,
+        "max_parallel_maintenance_workers": settings.pg_max_parallel_maintenance_workers,
+    }
+    for name, value in session_settings.items():
+        _set_session_param(conn, name, value)
+
+
+def _delete_previous_ingest(conn: psycopg.Connection, collection_id, source: str, run_id: str) -> int:
+    """
+    Remove da coleção os chunks do mesmo PDF que não são da ingestão atual (run_id).
+
+    Os ids são aleatórios (uuid4); sem isso, rodar a ingestão de novo
+    (inclusive após uma falha no meio) duplicaria os chunks. Também remove
+    sobras de uma ingestão anterior que falhou no meio.
+    """
+    cur = conn.execute(
+        f"DELETE FROM {EMBEDDING_TABLE} "
+        f"WHERE collection_id = %s AND cmetadata @> %s AND NOT cmetadata @> %s",
+        (collection_id, Jsonb({"source": source}), Jsonb({INGEST_RUN_KEY: run_id})),
+    )
+    return cur.rowcount
+
+
+def _vector_index_name(collection_id) -> str:
+    # um índice por coleção (identificadores do Postgres têm até 63 caracteres)
+    return f"ix_hnsw_{collection_id.hex}"
+
+
+def _drop_vector_index(conn: psycopg.Connection, collection_id) -> None:
+    """
+    Remove o índice vetorial da coleção para que os inserts não paguem a manutenção do índice.
+    """
+    conn.execute(
+        sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(_vector_index_name(collection_id)))
+    )
+
+
+def _create_vector_index(conn: psycopg.Connection, collection_id, dimension: int, vector_type: str) -> None:
+    """
+    Cria o índice HNSW da coleção (distância cosseno, padrão do PGVector) e atualiza as estatísticas.
+
+    A coluna `embedding` do langchain-postgres não tem dimensão fixa (a tabela
+    é compartilhada por todas as coleções, que podem usar modelos diferentes),
+    mas o HNSW exige uma. Por isso o índice é parcial (só esta coleção) e
+    sobre a expressão `embedding::vector(N)` (ou `halfvec(N)` acima de 2000
+    dimensões, ver _vector_index); a busca (search.py) ordena pela mesma
+    expressão para que o índice seja usado.
+    """
+    conn.execute(
+        sql.SQL(
+            "CREATE INDEX {index} ON {table} "
+            "USING hnsw ((embedding::{vector_type}({dimension})) {opclass}) "
+            "WITH (m = {m}, ef_construction = {ef_construction}) "
+            "WHERE collection_id = {collection_id}"
+        ).format(
+            index=sql.Identifier(_vector_index_name(collection_id)),
+            table=sql.Identifier(EMBEDDING_TABLE),
+            vector_type=sql.SQL(vector_type),
+            dimension=sql.Literal(dimension),
+            opclass=sql.SQL(f"{vector_type}_cosine_ops"),
+            m=sql.Literal(HNSW_M),
+            ef_construction=sql.Literal(HNSW_EF_CONSTRUCTION),
+            collection_id=sql.Literal(str(collection_id)),
+        )
+    )
+    conn.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(EMBEDDING_TABLE)))
+
+
+def _insert_embeddings_batched(store: PGVector, texts, vectors: np.ndarray, metadatas) -> None:
+    """
+    Fallback portável: insere via PGVector em lotes de INSERT_BATCH_SIZE.
+    """
+    for start in range(0, len(texts), INSERT_BATCH_SIZE):
+        end = start + INSERT_BATCH_SIZE
+        store.add_embeddings(
+            texts=texts[start:end],
+            embeddings=vectors[start:end].tolist(),
+            metadatas=metadatas[start:end],
+        )
+
+
+def store_chunks_in_pgvector(chunks, settings: Settings) -> IngestResult:
     """
     Gera embeddings e armazena no Postgres/pgvector.
 
+    Os chunks são consumidos em lotes (ao menos FLUSH_BATCH_SIZE, ou
+    embedding_batch_size * embedding_concurrency): cada lote é
+    vetorizado, gravado e commitado antes do próximo. Cada chunk leva o id
+    desta execução (INGEST_RUN_KEY); os chunks de uma ingestão anterior do
+    mesmo PDF só são removidos depois que a carga termina, então uma falha
+    no meio mantém a versão anterior pesquisável. O índice HNSW da
+    coleção é removido antes da carga e recriado ao final; se não puder ser
+    recriado, os dados continuam gravados (a busca só fica mais lenta).
+    Retorna o total de chunks armazenados e se o índice foi criado.
+
     REGRAS DO ENUNCIADO (implementadas aqui):
-    - cada chunk é convertido em embedding (PGVector chama o embedding internamente)
-    - vetores são armazenados no PostgreSQL com pgvector
+    - cada chunk é convertido em embedding (em lotes concorrentes)
+    - vetores são armazenados no PostgreSQL com pgvector (via COPY binário)
     """
     embeddings = build_embeddings(
         active_provider=settings.active_provider,
@@ -154,15 +458,127 @@ def store_chunks_in_pgvector(chunks, settings: Settings):
         embedding_model=settings.embedding_model,
     )
 
-    # regra: persistir vetores no PostgreSQL + pgvector
-    # regra: cada chunk vira embedding e é salvo
-    PGVector.from_documents(
-        documents=chunks,
-        embedding=embeddings,
+    batch_embeddings = None
+    flush_size = max(FLUSH_BATCH_SIZE, settings.embedding_batch_size * settings.embedding_concurrency)
+    if settings.use_batch_embeddings:
+        # ingestão é offline: a Batch API troca latência por custo/rate limit
+        batch_embeddings = build_batch_embeddings(
+            active_provider=settings.active_provider,
+            api_key=settings.api_key,
+            embedding_model=settings.embedding_model,
+        )
+        flush_size = BATCH_API_FLUSH_SIZE
+
+    # garante extensão, tabelas e coleção (não insere nada)
+    store = PGVector(
         connection=settings.database_url,
         collection_name=settings.collection_name,
+        embeddings=embeddings,
     )
 
+    total = 0
+    use_copy = True
+
+    # um único event loop para todos os lotes (o cliente async é reaproveitado)
+    with psycopg.connect(_psycopg_conninfo(settings.database_url)) as conn, asyncio.Runner() as runner:
+        register_vector(conn)
+        _tune_bulk_load_session(conn, settings)
+        collection_id = _get_collection_uuid(conn, settings.collection_name)
+
+        # carga primeiro, índice depois
+        _drop_vector_index(conn, collection_id)
+        conn.commit()
+
+        run_id = uuid.uuid4().hex
+
+        dimension = None
+
+        for batch in batched(chunks, flush_size):
+            texts = [chunk.page_content for chunk in batch]
+            metadatas = [{**chunk.metadata, INGEST_RUN_KEY: run_id} for chunk in batch]
+
+            # regra: cada chunk vira embedding
+            if batch_embeddings is not None:
+                vectors = batch_embeddings.embed_documents(texts)
+            else:
+                vectors = runner.run(
+                    _embed_all(
+                        texts,
+                        embeddings,
+                        batch_size=settings.embedding_batch_size,
+                        concurrency=settings.embedding_concurrency,
+                    )
+                )
+
+            # buffer contíguo float32 (4 bytes por dimensão, sem floats boxed)
+            vectors = np.asarray(vectors, dtype=np.float32)
+            dimension = dimension or vectors.shape[1]
+
+            # regra: persistir vetores no PostgreSQL + pgvector
+            if use_copy:
+                try:
+                    _copy_embeddings(conn, collection_id, texts, vectors, metadatas)
+                    conn.commit()
+                except psycopg.Error as exc:
+                    conn.rollback()
+                    print(f"COPY indisponível ({exc}); usando inserção em lotes de {INSERT_BATCH_SIZE}.")
+                    use_copy = False
+
+            if not use_copy:
+                _insert_embeddings_batched(store, texts, vectors, metadatas)
+
+            total += len(texts)
+            print(f"Chunks armazenados: {total}")
+
+            # libera o lote antes de acumular o próximo
+            del batch, texts, metadatas, vectors
+            gc.collect()
+
+        indexed = _build_vector_index(conn, collection_id, dimension)
+
+        # reingestão substitui a anterior só depois que a nova está completa
+        removed = _delete_previous_ingest(conn, collection_id, str(settings.pdf_path), run_id)
+        conn.commit()
+        if removed:
+            print(f"Chunks da ingestão anterior removidos: {removed}")
+
+    return IngestResult(chunks=total, indexed=indexed)
+
+
+def _build_vector_index(conn: psycopg.Connection, collection_id, dimension: int | None) -> bool:
+    """
+    Recria o índice HNSW da coleção ao final da carga.
+
+    Os chunks já estão commitados: uma falha aqui vira aviso (a busca
+    continua correta, apenas sem índice) em vez de derrubar a ingestão.
+    """
+    if dimension is None:
+        return False
+
+    vector_type = index_vector_type(dimension)
+    if vector_type is None:
+        print(f"Aviso: {dimension} dimensões excede o limite do HNSW; a coleção ficará sem índice vetorial.")
+        return False
+
+    print(f"Criando índice HNSW ({vector_type}({dimension}))...")
+    try:
+        try:
+            _create_vector_index(conn, collection_id, dimension, vector_type)
+        except (psycopg.errors.DiskFull, psycopg.errors.OutOfMemory) as exc:
+            # build paralelo usa memória compartilhada (~maintenance_work_mem);
+            # o /dev/shm padrão do Docker (64MB) costuma não comportar
+            conn.rollback()
+            print(f"Build paralelo do índice falhou ({exc}); tentando sem workers paralelos.")
+            _set_session_param(conn, "max_parallel_maintenance_workers", 0)
+            _create_vector_index(conn, collection_id, dimension, vector_type)
+        conn.commit()
+    except psycopg.Error as exc:
+        conn.rollback()
+        print(f"Aviso: índice HNSW não foi criado ({exc}); a coleção ficará sem índice vetorial.")
+        return False
+
+    return True
+
 
 # -----------------------------
 # Orquestração / entrypoint
@@ -178,16 +594,22 @@ def ingest_pdf() -> None:
     print(f"Collection: {settings.collection_name}")
     print(f"Database: {settings.database_url}")
 
+    # pipeline em streaming: páginas -> chunks -> lotes gravados no banco
     docs = load_pdf_documents(settings.pdf_path)
     chunks = split_into_chunks(docs)
 
-    if not chunks:
+    # valida antes de tocar no banco (PDF vazio ou escaneado)
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
         raise RuntimeError("Nenhum chunk gerado. O PDF pode estar sem texto extraível.")
 
-    print(f"Pages loaded: {len(docs)}")
-    print(f"Chunks gerados: {len(chunks)}")
+    result = store_chunks_in_pgvector(chain([first_chunk], chunks), settings)
+
+    print(f"Chunks gerados: {result.chunks}")
 
-    store_chunks_in_pgvector(chunks, settings)
+    if not result.indexed:
+        print("*** Ingestão finalizada SEM índice vetorial: vetores armazenados, mas a busca fará varredura completa. ***")
+        return
 
     print("*** Ingestão finalizada com sucesso! Vetores armazenados no Postgres/pgvector. ***")
 
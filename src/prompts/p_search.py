@@ -1,6 +1,9 @@
 # src/prompts/p_search.py
 from __future__ import annotations
 
+from string import Formatter
+from typing import Iterable
+
 PROMPT_TEMPLATE = """
 CONTEXTO:
 {contexto}
@@ -29,8 +32,43 @@ RESPONDA A "PERGUNTA DO USUÁRIO"
 """
 
 
-def build_prompt(contexto: str, pergunta: str) -> str:
-    return PROMPT_TEMPLATE.format(
+def _compile(template: str) -> tuple:
+    """
+    Pré-processa o template uma única vez: lista de (texto fixo, campo).
+    """
+    return tuple(
+        (literal, field)
+        for literal, field, _spec, _conversion in Formatter().parse(template)
+    )
+
+
+# Template já "compilado" na importação; cada pergunta só faz as substituições
+_PROMPT_PARTS = _compile(PROMPT_TEMPLATE)
+
+
+def _render(contexto: str, pergunta: str) -> str:
+    values = {"contexto": contexto, "pergunta": pergunta}
+    pieces = []
+    for literal, field in _PROMPT_PARTS:
+        pieces.append(literal)
+        if field is not None:
+            pieces.append(values[field])
+    return "".join(pieces)
+
+
+# Separador entre os trechos recuperados no CONTEXTO
+CONTEXT_SEPARATOR = "\n\n"
+
+
+def build_prompt(contexto: str | Iterable[str], pergunta: str) -> str:
+    """
+    Monta o prompt. `contexto` pode ser o texto pronto ou a lista de trechos
+    (concatenados uma única vez aqui, sem string intermediária no chamador).
+    """
+    if contexto and not isinstance(contexto, str):
+        contexto = CONTEXT_SEPARATOR.join(contexto)
+
+    return _render(
         contexto=(contexto or "").strip(),
         pergunta=(pergunta or "").strip(),
     )
@@ -1,73 +1,104 @@
 # src/search.py
 from __future__ import annotations
 
-import os
-from pathlib import Path
-from typing import List, Tuple
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
-from dotenv import load_dotenv
+import sqlalchemy
 from langchain_postgres import PGVector
 from langchain_openai import OpenAIEmbeddings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from pgvector.sqlalchemy import HALFVEC, Vector
 
+from _env import SETTINGS
+from _vector_index import index_vector_type
 from prompts.p_search import build_prompt
 
 
-def _load_env() -> dict:
+def _build_embeddings(active_provider: str, api_key: str, embedding_model: str):
     """
-    Carrega .env e devolve as configs necessárias para busca vetorial.
+    Cria o gerador de embeddings de acordo com o provedor ativo.
     """
-    project_root = Path(__file__).resolve().parents[1]
-    load_dotenv(project_root / ".env")
+    if active_provider == "openai":
+        return OpenAIEmbeddings(model=embedding_model, api_key=api_key)
+
+    if active_provider == "gemini":
+        return GoogleGenerativeAIEmbeddings(model=embedding_model, google_api_key=api_key)
 
-    active_provider = os.getenv("ACTIVE_PROVIDER", "openai").strip().lower()
-    database_url = os.getenv("DATABASE_URL", "")
-    collection_name = os.getenv("PG_VECTOR_COLLECTION_NAME", "documents")
+    raise ValueError("ACTIVE_PROVIDER inválido. Use 'openai' ou 'gemini'.")
 
-    if not database_url:
-        raise RuntimeError("DATABASE_URL não foi definido no arquivo .env")
 
-    if active_provider == "openai":
-        api_key = os.getenv("OPENAI_API_KEY", "")
-        embedding_model = os.getenv("OPENAI_EMBEDDING_MODEL", "")
-        if not api_key:
-            raise RuntimeError("OPENAI_API_KEY não foi definido no arquivo .env")
-        if not embedding_model:
-            raise RuntimeError("OPENAI_EMBEDDING_MODEL não foi definido no arquivo .env")
-
-    elif active_provider == "gemini":
-        api_key = os.getenv("GOOGLE_API_KEY", "")
-        embedding_model = os.getenv("GOOGLE_EMBEDDING_MODEL", "")
-        if not api_key:
-            raise RuntimeError("GOOGLE_API_KEY não foi definido no arquivo .env")
-        if not embedding_model:
-            raise RuntimeError("GOOGLE_EMBEDDING_MODEL não foi definido no arquivo .env")
-
-    else:
-        raise RuntimeError("ACTIVE_PROVIDER inválido. Use 'openai' ou 'gemini'.")
-
-    return {
-        "active_provider": active_provider,
-        "api_key": api_key,
-        "embedding_model": embedding_model,
-        "database_url": database_url,
-        "collection_name": collection_name,
-    }
+@dataclass(frozen=True)
+class _CollectionRef:
+    uuid: object
+    name: str
 
 
-def _build_embeddings(active_provider: str, api_key: str, embedding_model: str):
+class _SearchPGVector(PGVector):
     """
-    Cria o gerador de embeddings de acordo com o provedor ativo.
+    PGVector ajustado para a busca (somente leitura).
+
+    - consulta o uuid da coleção uma única vez: o PGVector padrão busca a
+      coleção pelo nome em toda consulta (uma ida extra ao banco)
+    - ordena por `embedding::vector(N)` (ou `halfvec(N)`), a mesma expressão
+      do índice HNSW criado pela ingestão (sem o cast, o índice não seria usado)
     """
-    if active_provider == "openai":
-        os.environ["OPENAI_API_KEY"] = api_key
-        return OpenAIEmbeddings(model=embedding_model)
 
-    if active_provider == "gemini":
-        os.environ["GOOGLE_API_KEY"] = api_key
-        return GoogleGenerativeAIEmbeddings(model=embedding_model)
+    _collection_ref: _CollectionRef | None = None
 
-    raise ValueError("ACTIVE_PROVIDER inválido. Use 'openai' ou 'gemini'.")
+    def get_collection(self, session):
+        if self._collection_ref is None:
+            collection = super().get_collection(session)
+            if collection is None:
+                return None
+            self._collection_ref = _CollectionRef(uuid=collection.uuid, name=collection.name)
+        return self._collection_ref
+
+    @property
+    def distance_strategy(self):
+        embedding_column = self.EmbeddingStore.embedding
+
+        def cosine_distance(embedding):
+            dimension = len(embedding)
+            vector_type = index_vector_type(dimension)
+            if vector_type == "vector":
+                return sqlalchemy.cast(embedding_column, Vector(dimension)).cosine_distance(embedding)
+            if vector_type == "halfvec":
+                return sqlalchemy.cast(embedding_column, HALFVEC(dimension)).cosine_distance(embedding)
+            # sem índice possível: distância direto na coluna
+            return embedding_column.cosine_distance(embedding)
+
+        return cosine_distance
+
+
+@lru_cache(maxsize=None)
+def _get_store() -> PGVector:
+    """
+    Cria (uma única vez) o cliente de embeddings e o PGVector.
+
+    Reaproveitar a instância evita recriar a sessão HTTP e o pool de
+    conexões do banco a cada pergunta.
+    """
+    embeddings = _build_embeddings(
+        SETTINGS["active_provider"], SETTINGS["api_key"], SETTINGS["embedding_model"]
+    )
+
+    return _SearchPGVector(
+        connection=SETTINGS["database_url"],
+        collection_name=SETTINGS["collection_name"],
+        embeddings=embeddings,
+    )
+
+
+def warm_up() -> None:
+    """
+    Cria antecipadamente o cliente de embeddings e o PGVector, para que a
+    primeira pergunta não pague a inicialização.
+    """
+    _get_store()
 
 
 def similarity_search_with_score(query: str, k: int = 10) -> List[Tuple[str, float]]:
@@ -80,17 +111,101 @@ def similarity_search_with_score(query: str, k: int = 10) -> List[Tuple[str, flo
     if not query or not query.strip():
         raise ValueError("Query inválida.")
 
-    cfg = _load_env()
-    embeddings = _build_embeddings(cfg["active_provider"], cfg["api_key"], cfg["embedding_model"])
+    key = (_normalize_query(query), k)
+    results = _cache_get(key)
+    if results is None:
+        docs = _get_store().similarity_search_with_score(query.strip(), k=k)
+        results = tuple((doc.page_content, float(score)) for doc, score in docs)
+        _cache_put(key, results)
 
-    store = PGVector(
-        connection=cfg["database_url"],
-        collection_name=cfg["collection_name"],
-        embeddings=embeddings,
-    )
+    return list(results)
 
-    results = store.similarity_search_with_score(query.strip(), k=k)
-    return [(doc.page_content, float(score)) for doc, score in results]
+
+def retrieve_texts(query: str, k: int = 10) -> List[str]:
+    """
+    Executa a busca vetorial e retorna apenas os textos (sem score).
+
+    Compartilha a entrada de cache de similarity_search_with_score.
+    """
+    return [text for text, _score in similarity_search_with_score(query, k=k)]
+
+
+def similarity_search_many(queries: List[str], k: int = 10) -> List[List[Tuple[str, float]]]:
+    """
+    Versão em lote de similarity_search_with_score.
+
+    As perguntas que não estão em cache são vetorizadas em uma única chamada
+    à API de embeddings; depois cada vetor é buscado no PGVector.
+    """
+    if any(not query or not query.strip() for query in queries):
+        raise ValueError("Query inválida.")
+
+    normalized = [_normalize_query(query) for query in queries]
+    resolved: Dict[str, Tuple[Tuple[str, float], ...]] = {}
+    # chave normalizada -> pergunta original (a 1ª ocorrência é a vetorizada)
+    missing: Dict[str, str] = {}
+    for key_text, query in zip(normalized, queries):
+        if key_text in resolved or key_text in missing:
+            continue
+        cached = _cache_get((key_text, k))
+        if cached is None:
+            missing[key_text] = query.strip()
+        else:
+            resolved[key_text] = cached
+
+    if missing:
+        store = _get_store()
+        vectors = _embed_queries(store.embeddings, list(missing.values()))
+        for key_text, vector in zip(missing, vectors):
+            docs = store.similarity_search_with_score_by_vector(vector, k=k)
+            results = tuple((doc.page_content, float(score)) for doc, score in docs)
+            _cache_put((key_text, k), results)
+            resolved[key_text] = results
+
+    return [list(resolved[key_text]) for key_text in normalized]
+
+
+def _embed_queries(embeddings, queries: List[str]) -> List[List[float]]:
+    """
+    Vetoriza várias perguntas em uma única requisição.
+    """
+    if isinstance(embeddings, GoogleGenerativeAIEmbeddings):
+        # mesmo task type usado pelo embed_query do Gemini
+        return embeddings.embed_documents(queries, task_type="RETRIEVAL_QUERY")
+    return embeddings.embed_documents(queries)
+
+
+# Cache LRU de resultados: (pergunta normalizada, k) -> [(texto, score)]
+# Vale pelo tempo de vida do processo: após uma nova ingestão, reinicie o chat.
+_SEARCH_CACHE_SIZE = 512
+_search_cache: OrderedDict = OrderedDict()
+# o chat aquece o cache em threads de background
+_cache_lock = threading.Lock()
+
+
+def _normalize_query(query: str) -> str:
+    """
+    Normaliza a pergunta para a chave do cache (caixa e espaços não mudam a chave).
+
+    Só a chave é normalizada; a busca usa o texto original da pergunta.
+    """
+    return " ".join(query.lower().split())
+
+
+def _cache_get(key):
+    with _cache_lock:
+        results = _search_cache.get(key)
+        if results is not None:
+            _search_cache.move_to_end(key)
+        return results
+
+
+def _cache_put(key, results) -> None:
+    with _cache_lock:
+        _search_cache[key] = results
+        _search_cache.move_to_end(key)
+        if len(_search_cache) > _SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
 
 
 def search_prompt(question: str) -> str:
@@ -102,15 +217,31 @@ def search_prompt(question: str) -> str:
     - injeta no template
     """
     # k=10 obrigatório pelo enunciado
-    results = similarity_search_with_score(question, k=10)
+    texts = retrieve_texts(question, k=10)
 
-    # for i, (text, score) in enumerate(results, start=1):
-    #     print(f"\n--- CHUNK {i} | score={score:.4f} ---\n")
+    # for i, text in enumerate(texts, start=1):
+    #     print(f"\n--- CHUNK {i} ---\n")
     #     print(text[:300])
 
-    contexto = "\n\n".join(text for text, _score in results)
+    return _build_search_prompt(question, texts)
+
+
+def search_prompts(questions: List[str]) -> List[str]:
+    """
+    Versão em lote de search_prompt: uma única chamada de embeddings para
+    todas as perguntas (útil para avaliação em lote ou entrada via pipe).
+    """
+    # k=10 obrigatório pelo enunciado
+    all_results = similarity_search_many(questions, k=10)
+    return [
+        _build_search_prompt(question, [text for text, _score in results])
+        for question, results in zip(questions, all_results)
+    ]
+
 
-    return build_prompt(contexto=contexto, pergunta=question)
+def _build_search_prompt(question: str, texts: List[str]) -> str:
+    # os trechos vão direto para o template, que os concatena uma única vez
+    return build_prompt(contexto=texts, pergunta=question)
 
 
 if __name__ == "__main__":